@@ -26,6 +26,10 @@ def create_app(config_name=None):
     app.config.from_object(config[config_name])
     config[config_name].init_app(app)
     
+    # JSON序列化（优先使用orjson）
+    from app.utils.json_provider import init_json_provider
+    init_json_provider(app)
+    
     # 初始化扩展
     db.init_app(app)
     migrate.init_app(app, db)
@@ -36,6 +40,14 @@ def create_app(config_name=None):
     login_manager.login_message = '请先登录以访问此页面。'
     login_manager.login_message_category = 'info'
     
+    # 启动时加载凭据加密密钥，避免worker并发首次访问时各自生成密钥
+    from app.utils.config_manager import config_manager
+    config_manager.init_app(app)
+    
+    # 按应用配置初始化OpenStack服务缓存
+    from app.services import openstack_service
+    openstack_service.initialize_config(app)
+    
     # 注册蓝图
     register_blueprints(app)
     
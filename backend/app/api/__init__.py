@@ -1,8 +1,15 @@
 """
 API蓝图
 """
-from flask import Blueprint
+from flask import Blueprint, current_app, jsonify, request
 
 api_bp = Blueprint('api', __name__)
 
-from . import routes
\ No newline at end of file
+@api_bp.before_request
+def limit_json_body():
+    """JSON请求体超过MAX_JSON_BODY_LENGTH时直接拒绝，不进入解析"""
+    max_length = current_app.config.get('MAX_JSON_BODY_LENGTH')
+    if max_length and request.is_json and (request.content_length or 0) > max_length:
+        return jsonify({'success': False, 'error': '请求数据过大'}), 413
+
+from . import routes
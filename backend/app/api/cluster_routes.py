@@ -2,6 +2,7 @@
 集群管理API路由
 提供集群的CRUD操作和状态管理
 """
+import hashlib
 import logging
 from datetime import datetime
 from flask import request, jsonify, current_app
@@ -11,6 +12,7 @@ from app.models.base import db
 from app.models.cluster import OpenstackCluster
 from app.models.log import OperationLog
 from app.services.openstack_service import openstack_service
+from app.utils.pagination import get_page_args
 
 logger = logging.getLogger(__name__)
 
@@ -20,8 +22,7 @@ def list_clusters():
     """获取集群列表"""
     try:
         # 获取查询参数
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 10, type=int)
+        page, per_page = get_page_args(10)
         active_only = request.args.get('active_only', 'true').lower() == 'true'
         
         # 构建查询
@@ -29,12 +30,28 @@ def list_clusters():
         if active_only:
             query = query.filter_by(is_active=True)
         
-        # 分页
-        clusters = query.order_by(OpenstackCluster.created_at.desc()).paginate(
+        # 任何修改都会更新updated_at，按总数和当前页各行的id、updated_at生成ETag，未变化时直接返回304
+        # （MySQL DATETIME只精确到秒，仅比较最大updated_at会漏掉同一秒内的其他修改）
+        count = query.count()
+        rows = query.with_entities(OpenstackCluster.id, OpenstackCluster.updated_at) \
+            .order_by(OpenstackCluster.created_at.desc()) \
+            .limit(per_page).offset((page - 1) * per_page).all()
+        digest = hashlib.sha1(";".join(
+            f"{row_id}:{updated_at.isoformat() if updated_at else ''}" for row_id, updated_at in rows
+        ).encode()).hexdigest()
+        etag = f"clusters-{page}-{per_page}-{int(active_only)}-{count}-{digest}"
+        if request.if_none_match.contains_weak(etag):
+            response = current_app.response_class(status=304)
+            response.set_etag(etag, weak=True)
+            return response
+        
+        # 分页，列表不返回凭据，不加载加密凭据列
+        clusters = query.options(db.defer(OpenstackCluster.encrypted_credentials)) \
+            .order_by(OpenstackCluster.created_at.desc()).paginate(
             page=page, per_page=per_page, error_out=False
         )
         
-        return jsonify({
+        response = jsonify({
             'success': True,
             'data': [cluster.to_dict() for cluster in clusters.items],
             'pagination': {
@@ -46,6 +63,8 @@ def list_clusters():
                 'has_prev': clusters.has_prev
             }
         })
+        response.set_etag(etag, weak=True)
+        return response
         
     except Exception as e:
         logger.error(f"Failed to list clusters: {str(e)}")
@@ -165,7 +184,7 @@ def update_cluster(cluster_id):
         cluster.updated_at = datetime.utcnow()
         db.session.commit()
         
-        # 清除相关缓存
+        # 清除相关缓存；认证配置变更后，各worker获取客户端时按新配置重建
         openstack_service.clear_cache(cluster_id)
         
         # 记录操作日志
@@ -205,8 +224,9 @@ def delete_cluster(cluster_id):
         db.session.delete(cluster)
         db.session.commit()
         
-        # 清除相关缓存
+        # 清除相关缓存，并移除该集群的客户端
         openstack_service.clear_cache(cluster_id)
+        openstack_service.release_cluster_clients(cluster_id)
         
         # 记录操作日志
         OperationLog.log_operation(
@@ -267,9 +287,10 @@ def get_cluster_resources(cluster_id):
             nova_client = clients['nova']
             cinder_client = clients['cinder']
             
-            # 获取统计数据
+            # 获取统计数据，实例和卷并发拉取
+            volumes_future = openstack_service.executor.submit(cinder_client.volumes.list)
             instances = nova_client.servers.list()
-            volumes = cinder_client.volumes.list()
+            volumes = volumes_future.result()
             
             # 按状态统计实例
             instance_stats = {}
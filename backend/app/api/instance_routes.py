@@ -4,13 +4,16 @@
 """
 import logging
 from datetime import datetime
-from flask import request, jsonify
+from operator import attrgetter
+from flask import request, jsonify, send_file
 from flask_login import login_required, current_user
 from . import api_bp as api
 from app.models.base import db
 from app.models.cluster import OpenstackCluster
 from app.models.log import OperationLog
 from app.services.openstack_service import openstack_service
+from app.utils.excel_export import build_excel, csv_response
+from app.utils.pagination import get_page_args
 
 logger = logging.getLogger(__name__)
 
@@ -21,8 +24,7 @@ def list_instances():
     try:
         # 获取查询参数
         cluster_id = request.args.get('cluster_id', type=int)
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
+        page, per_page = get_page_args()
         status = request.args.get('status')
         search = request.args.get('search', '').strip()
         expire_filter = request.args.get('expire_filter')  # normal, warning, expired
@@ -48,7 +50,7 @@ def list_instances():
                 nova_client = clients['nova']
                 
                 # 获取集群实例
-                logger.info(f"Getting instances for cluster {cluster.name}")
+                logger.debug("Getting instances for cluster %s", cluster.name)
                 servers = nova_client.servers.list(detailed=True)
                 
                 # 处理每个实例
@@ -697,10 +699,8 @@ def batch_instance_action():
 @api.route('/instances/export', methods=['POST'])
 @login_required
 def export_instances():
-    """导出实例数据到Excel"""
+    """导出实例数据到Excel，format为csv时以流式CSV返回"""
     try:
-        import pandas as pd
-        from io import BytesIO
         from datetime import datetime
         
         cluster_id = request.args.get('cluster_id', type=int)
@@ -710,6 +710,7 @@ def export_instances():
         data = request.get_json()
         instance_ids = data.get('instance_ids', [])
         export_all = data.get('export_all', False)
+        export_format = data.get('format', 'xlsx')
         
         cluster = OpenstackCluster.query.get_or_404(cluster_id)
         clients = openstack_service.get_cluster_clients(cluster_id)
@@ -721,7 +722,7 @@ def export_instances():
         else:
             servers = [nova_client.servers.get(instance_id) for instance_id in instance_ids]
         
-        # 转换为DataFrame
+        # 整理导出数据
         instance_data = []
         for server in servers:
             # 获取IP地址
@@ -750,29 +751,6 @@ def export_instances():
         if not instance_data:
             return jsonify({'success': False, 'error': '没有找到实例数据'}), 400
         
-        df = pd.DataFrame(instance_data)
-        
-        # 创建Excel文件
-        output = BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            df.to_excel(writer, sheet_name='实例列表', index=False)
-            
-            # 设置列宽
-            worksheet = writer.sheets['实例列表']
-            for column in worksheet.columns:
-                max_length = 0
-                column_letter = column[0].column_letter
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                adjusted_width = min(max_length + 2, 50)
-                worksheet.column_dimensions[column_letter].width = adjusted_width
-        
-        output.seek(0)
-        
         # 记录操作日志
         OperationLog.log_operation(
             user_id=current_user.id,
@@ -785,14 +763,21 @@ def export_instances():
         
         # 生成文件名
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"instances_{cluster.name}_{timestamp}.xlsx"
         
-        from flask import make_response
-        response = make_response(output.read())
-        response.headers['Content-Type'] = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+        if export_format == 'csv':
+            # 边生成边发送，不在内存中拼接完整文件
+            return csv_response(instance_data, f'instances_{cluster.name}_{timestamp}.csv')
+        
+        # 创建Excel文件
+        output = build_excel(instance_data, '实例列表')
+        filename = f"instances_{cluster.name}_{timestamp}.xlsx"
         
-        return response
+        return send_file(
+            output,
+            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+            as_attachment=True,
+            download_name=filename
+        )
         
     except Exception as e:
         logger.error(f"Failed to export instances: {str(e)}")
@@ -921,6 +906,164 @@ def check_expired_instances():
         logger.error(f"Failed to check expired instances: {str(e)}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+# 镜像/规格数量可能上千，必填字段用attrgetter一次取出
+_IMAGE_FIELDS = ('id', 'name', 'status')
+_image_attrs = attrgetter(*_IMAGE_FIELDS)
+_FLAVOR_FIELDS = ('id', 'name', 'vcpus', 'ram', 'disk')
+_flavor_attrs = attrgetter(*_FLAVOR_FIELDS)
+
+def _load_create_data(cluster_id):
+    """从OpenStack获取创建实例所需的数据，返回(数据, 是否全部获取成功)"""
+    clients = openstack_service.get_cluster_clients(cluster_id)
+    nova_client = clients['nova']
+    neutron_client = clients['neutron']
+    glance_client = clients['glance']
+    complete = True
+    
+    # 获取镜像列表
+    logger.debug("获取镜像列表")
+    try:
+        images = list(glance_client.images.list())
+        image_list = [
+            {
+                **dict(zip(_IMAGE_FIELDS, _image_attrs(image))),
+                'size': getattr(image, 'size', 0),
+                'disk_format': getattr(image, 'disk_format', 'unknown'),
+                'container_format': getattr(image, 'container_format', 'unknown'),
+                'visibility': getattr(image, 'visibility', 'private'),
+                'min_disk': getattr(image, 'min_disk', 0),
+                'min_ram': getattr(image, 'min_ram', 0),
+                'created_at': getattr(image, 'created_at', None),
+                'updated_at': getattr(image, 'updated_at', None)
+            }
+            for image in images
+            if getattr(image, 'status', None) == 'active'
+        ]
+    except Exception as e:
+        logger.warning(f"获取镜像列表失败: {e}")
+        image_list = []
+        complete = False
+    
+    # 获取规格列表
+    logger.debug("获取规格列表")
+    try:
+        flavors = nova_client.flavors.list(detailed=True)
+        flavor_list = [
+            {
+                **dict(zip(_FLAVOR_FIELDS, _flavor_attrs(flavor))),
+                'swap': getattr(flavor, 'swap', 0),
+                'ephemeral': getattr(flavor, 'OS-FLV-EXT-DATA:ephemeral', 0),
+                'rxtx_factor': getattr(flavor, 'rxtx_factor', 1.0),
+                'is_public': getattr(flavor, 'os-flavor-access:is_public', True)
+            }
+            for flavor in flavors
+            if not getattr(flavor, 'OS-FLV-DISABLED:disabled', False)
+        ]
+    except Exception as e:
+        logger.warning(f"获取规格列表失败: {e}")
+        flavor_list = []
+        complete = False
+    
+    # 获取网络列表
+    logger.debug("获取网络列表")
+    try:
+        networks = neutron_client.list_networks()['networks']
+        network_list = []
+        for network in networks:
+            if network.get('status') == 'ACTIVE':
+                # 获取子网信息
+                subnets = []
+                for subnet_id in network.get('subnets', []):
+                    try:
+                        subnet = neutron_client.show_subnet(subnet_id)['subnet']
+                        subnets.append({
+                            'id': subnet['id'],
+                            'name': subnet['name'],
+                            'cidr': subnet['cidr'],
+                            'gateway_ip': subnet.get('gateway_ip'),
+                            'ip_version': subnet['ip_version']
+                        })
+                    except:
+                        pass
+                
+                network_info = {
+                    'id': network['id'],
+                    'name': network['name'],
+                    'status': network['status'],
+                    'admin_state_up': network.get('admin_state_up', True),
+                    'shared': network.get('shared', False),
+                    'external': network.get('router:external', False),
+                    'subnets': subnets
+                }
+                network_list.append(network_info)
+    except Exception as e:
+        logger.warning(f"获取网络列表失败: {e}")
+        network_list = []
+        complete = False
+    
+    # 获取密钥对列表
+    logger.debug("获取密钥对列表")
+    try:
+        keypairs = nova_client.keypairs.list()
+        keypair_list = []
+        for kp in keypairs:
+            keypair_info = {
+                'name': kp.name,
+                'fingerprint': getattr(kp, 'fingerprint', ''),
+                'type': getattr(kp, 'type', 'ssh')
+            }
+            keypair_list.append(keypair_info)
+    except Exception as e:
+        logger.warning(f"获取密钥对列表失败: {e}")
+        keypair_list = []
+        complete = False
+    
+    # 获取安全组列表
+    logger.debug("获取安全组列表")
+    try:
+        security_groups = neutron_client.list_security_groups()['security_groups']
+        sg_list = []
+        for sg in security_groups:
+            sg_info = {
+                'id': sg['id'],
+                'name': sg['name'],
+                'description': sg.get('description', ''),
+                'tenant_id': sg.get('tenant_id', ''),
+                'rules_count': len(sg.get('security_group_rules', []))
+            }
+            sg_list.append(sg_info)
+    except Exception as e:
+        logger.warning(f"获取安全组列表失败: {e}")
+        sg_list = []
+        complete = False
+    
+    # 获取可用区列表
+    logger.debug("获取可用区列表")
+    try:
+        availability_zones = nova_client.availability_zones.list()
+        az_list = []
+        for az in availability_zones:
+            if az.zoneState.get('available'):
+                az_info = {
+                    'name': az.zoneName,
+                    'available': az.zoneState.get('available', False),
+                    'hosts': list(az.hosts.keys()) if hasattr(az, 'hosts') else []
+                }
+                az_list.append(az_info)
+    except Exception as e:
+        logger.warning(f"获取可用区列表失败: {e}")
+        az_list = []
+        complete = False
+    
+    return {
+        'images': image_list,
+        'flavors': flavor_list,
+        'networks': network_list,
+        'keypairs': keypair_list,
+        'security_groups': sg_list,
+        'availability_zones': az_list
+    }, complete
+
 @api.route('/instances/create-data', methods=['GET'])
 @login_required
 def get_create_data():
@@ -931,157 +1074,17 @@ def get_create_data():
             return jsonify({'success': False, 'error': '必须指定集群ID'}), 400
         
         cluster = OpenstackCluster.query.get_or_404(cluster_id)
-        clients = openstack_service.get_cluster_clients(cluster_id)
-        nova_client = clients['nova']
-        neutron_client = clients['neutron']
-        glance_client = clients['glance']
         
-        # 获取镜像列表
-        logger.info("获取镜像列表")
-        try:
-            images = list(glance_client.images.list())
-            image_list = []
-            for image in images:
-                if hasattr(image, 'status') and image.status == 'active':
-                    image_info = {
-                        'id': image.id,
-                        'name': image.name,
-                        'status': image.status,
-                        'size': getattr(image, 'size', 0),
-                        'disk_format': getattr(image, 'disk_format', 'unknown'),
-                        'container_format': getattr(image, 'container_format', 'unknown'),
-                        'visibility': getattr(image, 'visibility', 'private'),
-                        'min_disk': getattr(image, 'min_disk', 0),
-                        'min_ram': getattr(image, 'min_ram', 0),
-                        'created_at': getattr(image, 'created_at', None),
-                        'updated_at': getattr(image, 'updated_at', None)
-                    }
-                    image_list.append(image_info)
-        except Exception as e:
-            logger.warning(f"获取镜像列表失败: {e}")
-            image_list = []
-        
-        # 获取规格列表
-        logger.info("获取规格列表")
-        try:
-            flavors = nova_client.flavors.list(detailed=True)
-            flavor_list = []
-            for flavor in flavors:
-                if not getattr(flavor, 'OS-FLV-DISABLED:disabled', False):
-                    flavor_info = {
-                        'id': flavor.id,
-                        'name': flavor.name,
-                        'vcpus': flavor.vcpus,
-                        'ram': flavor.ram,
-                        'disk': flavor.disk,
-                        'swap': getattr(flavor, 'swap', 0),
-                        'ephemeral': getattr(flavor, 'OS-FLV-EXT-DATA:ephemeral', 0),
-                        'rxtx_factor': getattr(flavor, 'rxtx_factor', 1.0),
-                        'is_public': getattr(flavor, 'os-flavor-access:is_public', True)
-                    }
-                    flavor_list.append(flavor_info)
-        except Exception as e:
-            logger.warning(f"获取规格列表失败: {e}")
-            flavor_list = []
-        
-        # 获取网络列表
-        logger.info("获取网络列表")
-        try:
-            networks = neutron_client.list_networks()['networks']
-            network_list = []
-            for network in networks:
-                if network.get('status') == 'ACTIVE':
-                    # 获取子网信息
-                    subnets = []
-                    for subnet_id in network.get('subnets', []):
-                        try:
-                            subnet = neutron_client.show_subnet(subnet_id)['subnet']
-                            subnets.append({
-                                'id': subnet['id'],
-                                'name': subnet['name'],
-                                'cidr': subnet['cidr'],
-                                'gateway_ip': subnet.get('gateway_ip'),
-                                'ip_version': subnet['ip_version']
-                            })
-                        except:
-                            pass
-                    
-                    network_info = {
-                        'id': network['id'],
-                        'name': network['name'],
-                        'status': network['status'],
-                        'admin_state_up': network.get('admin_state_up', True),
-                        'shared': network.get('shared', False),
-                        'external': network.get('router:external', False),
-                        'subnets': subnets
-                    }
-                    network_list.append(network_info)
-        except Exception as e:
-            logger.warning(f"获取网络列表失败: {e}")
-            network_list = []
-        
-        # 获取密钥对列表
-        logger.info("获取密钥对列表")
-        try:
-            keypairs = nova_client.keypairs.list()
-            keypair_list = []
-            for kp in keypairs:
-                keypair_info = {
-                    'name': kp.name,
-                    'fingerprint': getattr(kp, 'fingerprint', ''),
-                    'type': getattr(kp, 'type', 'ssh')
-                }
-                keypair_list.append(keypair_info)
-        except Exception as e:
-            logger.warning(f"获取密钥对列表失败: {e}")
-            keypair_list = []
-        
-        # 获取安全组列表
-        logger.info("获取安全组列表")
-        try:
-            security_groups = neutron_client.list_security_groups()['security_groups']
-            sg_list = []
-            for sg in security_groups:
-                sg_info = {
-                    'id': sg['id'],
-                    'name': sg['name'],
-                    'description': sg.get('description', ''),
-                    'tenant_id': sg.get('tenant_id', ''),
-                    'rules_count': len(sg.get('security_group_rules', []))
-                }
-                sg_list.append(sg_info)
-        except Exception as e:
-            logger.warning(f"获取安全组列表失败: {e}")
-            sg_list = []
-        
-        # 获取可用区列表
-        logger.info("获取可用区列表")
-        try:
-            availability_zones = nova_client.availability_zones.list()
-            az_list = []
-            for az in availability_zones:
-                if az.zoneState.get('available'):
-                    az_info = {
-                        'name': az.zoneName,
-                        'available': az.zoneState.get('available', False),
-                        'hosts': list(az.hosts.keys()) if hasattr(az, 'hosts') else []
-                    }
-                    az_list.append(az_info)
-        except Exception as e:
-            logger.warning(f"获取可用区列表失败: {e}")
-            az_list = []
+        # 创建表单数据变化不频繁，按集群短时缓存，避免每次打开表单都请求多个服务
+        data = openstack_service.get_resource_cache(cluster_id, 'create_data')
+        if data is None:
+            data, complete = _load_create_data(cluster_id)
+            if complete:
+                openstack_service.set_resource_cache(cluster_id, 'create_data', data)
         
         return jsonify({
             'success': True,
-            'data': {
-                'images': image_list,
-                'flavors': flavor_list,
-                'networks': network_list,
-                'keypairs': keypair_list,
-                'security_groups': sg_list,
-                'availability_zones': az_list,
-                'cluster_name': cluster.name
-            }
+            'data': {**data, 'cluster_name': cluster.name}
         })
         
     except Exception as e:
@@ -1202,39 +1205,35 @@ def list_all_cluster_instances():
     """获取所有集群的实例列表"""
     try:
         # 获取查询参数
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
+        page, per_page = get_page_args()
         status = request.args.get('status')
         search = request.args.get('search', '').strip()
         expire_filter = request.args.get('expire_filter')  # normal, warning, expired
         
         # 获取所有活跃集群
         clusters = OpenstackCluster.query.filter_by(is_active=True).all()
+        clusters_by_id = {cluster.id: cluster for cluster in clusters}
         
-        # 获取所有实例数据
+        # 获取所有实例数据（各集群并发请求）
         all_instances = []
         cluster_names = []
         
-        for cluster in clusters:
-            try:
-                # 获取OpenStack客户端
-                clients = openstack_service.get_cluster_clients(cluster.id)
-                nova_client = clients['nova']
-                
-                # 获取集群实例
-                logger.info(f"Getting instances for cluster {cluster.name}")
-                servers = nova_client.servers.list(detailed=True)
-                
-                # 处理每个实例
-                for server in servers:
-                    all_instances.append((server, cluster))
-                
-                cluster_names.append(cluster.name)
-                
-            except Exception as e:
-                logger.warning(f"Failed to get instances from cluster {cluster.name}: {e}")
+        def fetch_cluster_servers(cluster_id):
+            clients = openstack_service.get_cluster_clients(cluster_id)
+            return clients['nova'].servers.list(detailed=True)
+        
+        for cluster_id, servers, error in openstack_service.map_clusters(fetch_cluster_servers, list(clusters_by_id)):
+            cluster = clusters_by_id[cluster_id]
+            if error is not None:
+                logger.warning(f"Failed to get instances from cluster {cluster.name}: {error}")
                 continue
         
+            # 处理每个实例
+            for server in servers:
+                all_instances.append((server, cluster))
+        
+            cluster_names.append(cluster.name)
+        
         # 转换为字典格式，并添加到期状态
         instances = []
         current_time = datetime.utcnow()
@@ -10,7 +10,9 @@ from . import api_bp as api
 from app.models.base import db
 from app.models.cluster import OpenstackCluster
 from app.models.log import OperationLog
+from app.utils.excel_export import build_excel
 from app.services.openstack_service import get_openstack_service
+from app.utils.pagination import get_page_args
 
 logger = logging.getLogger(__name__)
 
@@ -21,8 +23,7 @@ def list_networks():
     try:
         # 获取查询参数
         cluster_id = request.args.get('cluster_id', type=int)
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
+        page, per_page = get_page_args()
         network_type = request.args.get('network_type')  # external, internal
         status = request.args.get('status')
         search = request.args.get('search', '').strip()
@@ -48,7 +49,7 @@ def list_networks():
                 neutron_client = clients['neutron']
                 
                 # 获取集群网络
-                logger.info(f"Getting networks for cluster {cluster.name}")
+                logger.debug("Getting networks for cluster %s", cluster.name)
                 networks = neutron_client.list_networks()['networks']
                 
                 # 处理每个网络
@@ -182,8 +183,7 @@ def list_all_cluster_networks():
     """获取所有集群的网络列表"""
     try:
         # 获取查询参数
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
+        page, per_page = get_page_args()
         network_type = request.args.get('network_type')  # external, internal
         status = request.args.get('status')
         search = request.args.get('search', '').strip()
@@ -203,7 +203,7 @@ def list_all_cluster_networks():
                 neutron_client = clients['neutron']
                 
                 # 获取集群网络
-                logger.info(f"Getting networks for cluster {cluster.name}")
+                logger.debug("Getting networks for cluster %s", cluster.name)
                 networks = neutron_client.list_networks()['networks']
                 
                 # 处理每个网络
@@ -463,6 +463,9 @@ def network_action(network_id):
         else:
             return jsonify({'success': False, 'error': f'不支持的操作: {action}'}), 400
         
+        # 创建实例表单缓存了网络（含名称、状态、共享），网络变更后清除
+        openstack_service.invalidate_resource_cache(cluster_id)
+        
         # 记录操作日志
         OperationLog.log_operation(
             user_id=current_user.id,
@@ -585,6 +588,8 @@ def create_network():
                     logger.warning(f"Failed to create subnet for network {network['id']}: {e}")
                     continue
         
+        openstack_service.invalidate_resource_cache(cluster_id)
+        
         # 记录操作日志
         OperationLog.log_operation(
             user_id=current_user.id,
@@ -632,8 +637,7 @@ def list_subnets():
     try:
         cluster_id = request.args.get('cluster_id', type=int)
         network_id = request.args.get('network_id')
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
+        page, per_page = get_page_args()
         search = request.args.get('search', '').strip()
         
         if not cluster_id:
@@ -776,6 +780,9 @@ def subnet_action(subnet_id):
         else:
             return jsonify({'success': False, 'error': f'不支持的操作: {action}'}), 400
         
+        # 创建实例表单缓存了子网（含网关），子网变更后清除
+        openstack_service.invalidate_resource_cache(cluster_id)
+        
         # 记录操作日志
         OperationLog.log_operation(
             user_id=current_user.id,
@@ -897,8 +904,6 @@ def batch_network_action():
 def export_networks():
     """导出网络数据到Excel"""
     try:
-        import pandas as pd
-        from io import BytesIO
         from datetime import datetime
         
         cluster_id = request.args.get('cluster_id', type=int)
@@ -966,29 +971,8 @@ def export_networks():
                 '集群名称': cluster.name
             })
         
-        # 创建DataFrame
-        df = pd.DataFrame(excel_data)
-        
         # 创建Excel文件
-        output = BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            df.to_excel(writer, sheet_name='网络列表', index=False)
-            
-            # 设置列宽
-            worksheet = writer.sheets['网络列表']
-            for column in worksheet.columns:
-                max_length = 0
-                column_letter = column[0].column_letter
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                adjusted_width = min(max_length + 2, 50)
-                worksheet.column_dimensions[column_letter].width = adjusted_width
-        
-        output.seek(0)
+        output = build_excel(excel_data, '网络列表')
         
         # 生成文件名
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
@@ -1005,7 +989,7 @@ def export_networks():
         )
         
         return send_file(
-            BytesIO(output.getvalue()),
+            output,
             mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
             as_attachment=True,
             download_name=filename
@@ -1021,8 +1005,6 @@ def export_networks():
 def export_networks_cross_cluster():
     """跨集群导出网络数据到Excel"""
     try:
-        import pandas as pd
-        from io import BytesIO
         from datetime import datetime
         
         data = request.get_json()
@@ -1109,29 +1091,8 @@ def export_networks_cross_cluster():
                 '集群名称': network.get('cluster_name', '')
             })
         
-        # 创建DataFrame
-        df = pd.DataFrame(excel_data)
-        
         # 创建Excel文件
-        output = BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            df.to_excel(writer, sheet_name='网络列表', index=False)
-            
-            # 设置列宽
-            worksheet = writer.sheets['网络列表']
-            for column in worksheet.columns:
-                max_length = 0
-                column_letter = column[0].column_letter
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                adjusted_width = min(max_length + 2, 50)
-                worksheet.column_dimensions[column_letter].width = adjusted_width
-        
-        output.seek(0)
+        output = build_excel(excel_data, '网络列表')
         
         # 生成文件名
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
@@ -1149,7 +1110,7 @@ def export_networks_cross_cluster():
             )
         
         return send_file(
-            BytesIO(output.getvalue()),
+            output,
             mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
             as_attachment=True,
             download_name=filename
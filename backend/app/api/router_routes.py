@@ -11,6 +11,7 @@ from app.models.base import db
 from app.models.cluster import OpenstackCluster
 from app.models.log import OperationLog
 from app.services.openstack_service import get_openstack_service
+from app.utils.pagination import get_page_args
 
 logger = logging.getLogger(__name__)
 
@@ -21,8 +22,7 @@ def list_routers():
     try:
         # 获取查询参数
         cluster_id = request.args.get('cluster_id', type=int)
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
+        page, per_page = get_page_args()
         status = request.args.get('status')
         search = request.args.get('search', '').strip()
         
@@ -48,7 +48,7 @@ def list_routers():
                 neutron_client = clients['neutron']
                 
                 # 获取集群路由器
-                logger.info(f"Getting routers for cluster {cluster.name}")
+                logger.debug("Getting routers for cluster %s", cluster.name)
                 routers = neutron_client.list_routers()['routers']
                 
                 # 处理每个路由器
@@ -138,8 +138,7 @@ def list_all_cluster_routers():
     """获取所有集群的路由器列表"""
     try:
         # 获取查询参数
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
+        page, per_page = get_page_args()
         status = request.args.get('status')
         search = request.args.get('search', '').strip()
         
@@ -158,7 +157,7 @@ def list_all_cluster_routers():
                 neutron_client = clients['neutron']
                 
                 # 获取集群路由器
-                logger.info(f"Getting routers for cluster {cluster.name}")
+                logger.debug("Getting routers for cluster %s", cluster.name)
                 routers = neutron_client.list_routers()['routers']
                 
                 # 处理每个路由器
@@ -11,6 +11,7 @@ from app.models.base import db
 from app.models.cluster import OpenstackCluster
 from app.models.log import OperationLog
 from app.services.openstack_service import get_openstack_service
+from app.utils.pagination import get_page_args
 
 logger = logging.getLogger(__name__)
 
@@ -21,8 +22,7 @@ def list_security_groups():
     try:
         # 获取查询参数
         cluster_id = request.args.get('cluster_id', type=int)
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
+        page, per_page = get_page_args()
         search = request.args.get('search', '').strip()
         
         # 如果没有指定集群ID，选择默认集群
@@ -47,7 +47,7 @@ def list_security_groups():
                 neutron_client = clients['neutron']
                 
                 # 获取集群安全组
-                logger.info(f"Getting security groups for cluster {cluster.name}")
+                logger.debug("Getting security groups for cluster %s", cluster.name)
                 security_groups = neutron_client.list_security_groups()['security_groups']
                 
                 # 处理每个安全组
@@ -118,8 +118,7 @@ def list_all_cluster_security_groups():
     """获取所有集群的安全组列表"""
     try:
         # 获取查询参数
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
+        page, per_page = get_page_args()
         search = request.args.get('search', '').strip()
         
         # 获取所有活跃集群
@@ -137,7 +136,7 @@ def list_all_cluster_security_groups():
                 neutron_client = clients['neutron']
                 
                 # 获取集群安全组
-                logger.info(f"Getting security groups for cluster {cluster.name}")
+                logger.debug("Getting security groups for cluster %s", cluster.name)
                 security_groups = neutron_client.list_security_groups()['security_groups']
                 
                 # 处理每个安全组
@@ -373,6 +372,9 @@ def security_group_action(sg_id):
         else:
             return jsonify({'success': False, 'error': f'不支持的操作: {action}'}), 400
         
+        # 创建实例表单缓存了安全组（含名称、规则数），安全组变更后清除
+        openstack_service.invalidate_resource_cache(cluster_id)
+        
         # 记录操作日志
         OperationLog.log_operation(
             user_id=current_user.id,
@@ -480,6 +482,8 @@ def create_security_group():
                     logger.warning(f"Failed to create rule for security group {security_group['id']}: {rule_error}")
                     continue
         
+        openstack_service.invalidate_resource_cache(cluster_id)
+        
         # 记录操作日志
         OperationLog.log_operation(
             user_id=current_user.id,
@@ -571,6 +575,7 @@ def batch_security_group_action():
                             message = '不能删除默认安全组'
                         else:
                             neutron_client.delete_security_group(sg_id)
+                            openstack_service.invalidate_resource_cache(cluster_id)
                             message = '删除成功'
                             success_count += 1
                             
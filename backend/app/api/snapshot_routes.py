@@ -11,6 +11,7 @@ from app.models.base import db
 from app.models.cluster import OpenstackCluster
 from app.models.log import OperationLog
 from app.services.openstack_service import openstack_service
+from app.utils.pagination import get_page_args
 
 logger = logging.getLogger(__name__)
 
@@ -21,8 +22,7 @@ def list_snapshots():
     try:
         # 获取查询参数
         cluster_id = request.args.get('cluster_id', type=int)
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
+        page, per_page = get_page_args()
         snapshot_type = request.args.get('type')  # volume, instance
         status = request.args.get('status')
         search = request.args.get('search', '').strip()
@@ -47,7 +47,7 @@ def list_snapshots():
                 cinder_client = clients['cinder']
                 nova_client = clients['nova']
                 
-                logger.info(f"Getting snapshots for cluster {cluster.name}")
+                logger.debug("Getting snapshots for cluster %s", cluster.name)
                 
                 # 获取卷快照
                 if not snapshot_type or snapshot_type == 'volume':
@@ -230,8 +230,7 @@ def list_all_cluster_snapshots():
     """获取所有集群的快照列表"""
     try:
         # 获取查询参数
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
+        page, per_page = get_page_args()
         snapshot_type = request.args.get('type')  # volume, instance
         status = request.args.get('status')
         search = request.args.get('search', '').strip()
@@ -250,7 +249,7 @@ def list_all_cluster_snapshots():
                 cinder_client = clients['cinder']
                 nova_client = clients['nova']
                 
-                logger.info(f"Getting snapshots for cluster {cluster.name}")
+                logger.debug("Getting snapshots for cluster %s", cluster.name)
                 
                 # 获取卷快照
                 if not snapshot_type or snapshot_type == 'volume':
@@ -610,6 +609,8 @@ def snapshot_action(snapshot_id):
                 if not current_user.has_role(['super_admin', 'admin']):
                     return jsonify({'success': False, 'error': '删除快照需要管理员权限'}), 403
                 glance_client.images.delete(snapshot_id)
+                # 创建实例表单缓存了镜像列表，快照镜像删除后清除
+                openstack_service.invalidate_resource_cache(cluster_id)
                 result_message = f"实例快照 {snapshot_name} 删除命令已发送"
                 
             else:
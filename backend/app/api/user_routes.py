@@ -11,6 +11,8 @@ from . import api_bp as api
 from app.models.base import db
 from app.models.user import User
 from app.models.log import OperationLog
+from app.utils.excel_export import build_excel
+from app.utils.pagination import get_page_args
 
 logger = logging.getLogger(__name__)
 
@@ -31,8 +33,7 @@ def list_users():
     """获取用户列表"""
     try:
         # 获取查询参数
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
+        page, per_page = get_page_args()
         role = request.args.get('role')
         is_active = request.args.get('is_active')
         search = request.args.get('search', '').strip()
@@ -474,8 +475,6 @@ def batch_user_action():
 def export_users():
     """导出用户数据到Excel"""
     try:
-        import pandas as pd
-        from io import BytesIO
         
         data = request.get_json()
         export_all = data.get('export_all', True)
@@ -527,29 +526,8 @@ def export_users():
                 '操作记录数': user.operation_logs.count()
             })
         
-        # 创建DataFrame
-        df = pd.DataFrame(excel_data)
-        
         # 创建Excel文件
-        output = BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            df.to_excel(writer, sheet_name='用户列表', index=False)
-            
-            # 设置列宽
-            worksheet = writer.sheets['用户列表']
-            for column in worksheet.columns:
-                max_length = 0
-                column_letter = column[0].column_letter
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                adjusted_width = min(max_length + 2, 50)
-                worksheet.column_dimensions[column_letter].width = adjusted_width
-        
-        output.seek(0)
+        output = build_excel(excel_data, '用户列表')
         
         # 生成文件名
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
@@ -565,7 +543,7 @@ def export_users():
         )
         
         return send_file(
-            BytesIO(output.getvalue()),
+            output,
             mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
             as_attachment=True,
             download_name=filename
@@ -11,6 +11,8 @@ from app.models.base import db
 from app.models.cluster import OpenstackCluster
 from app.models.log import OperationLog
 from app.services.openstack_service import openstack_service
+from app.utils.excel_export import build_excel, csv_response
+from app.utils.pagination import get_page_args
 
 logger = logging.getLogger(__name__)
 
@@ -21,8 +23,7 @@ def list_volumes():
     try:
         # 获取查询参数
         cluster_id = request.args.get('cluster_id', type=int)
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
+        page, per_page = get_page_args()
         status = request.args.get('status')
         search = request.args.get('search', '').strip()
         volume_type = request.args.get('volume_type')
@@ -47,7 +48,7 @@ def list_volumes():
                 cinder_client = clients['cinder']
                 
                 # 获取集群卷
-                logger.info(f"Getting volumes for cluster {cluster.name}")
+                logger.debug("Getting volumes for cluster %s", cluster.name)
                 volumes = cinder_client.volumes.list(detailed=True)
                 
                 # 处理每个卷
@@ -150,38 +151,34 @@ def list_all_cluster_volumes():
     """获取所有集群的卷列表"""
     try:
         # 获取查询参数
-        page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
+        page, per_page = get_page_args()
         status = request.args.get('status')
         search = request.args.get('search', '').strip()
         volume_type = request.args.get('volume_type')
         
         # 获取所有活跃集群
         clusters = OpenstackCluster.query.filter_by(is_active=True).all()
+        clusters_by_id = {cluster.id: cluster for cluster in clusters}
         
-        # 获取所有卷数据
+        # 获取所有卷数据（各集群并发请求）
         all_volumes = []
         cluster_names = []
         
-        for cluster in clusters:
-            try:
-                # 获取OpenStack客户端
-                clients = openstack_service.get_cluster_clients(cluster.id)
-                cinder_client = clients['cinder']
-                
-                # 获取集群卷
-                logger.info(f"Getting volumes for cluster {cluster.name}")
-                volumes = cinder_client.volumes.list(detailed=True)
-                
-                # 处理每个卷
-                for volume in volumes:
-                    all_volumes.append((volume, cluster))
-                
-                cluster_names.append(cluster.name)
-                
-            except Exception as e:
-                logger.warning(f"Failed to get volumes from cluster {cluster.name}: {e}")
+        def fetch_cluster_volumes(cluster_id):
+            clients = openstack_service.get_cluster_clients(cluster_id)
+            return clients['cinder'].volumes.list(detailed=True)
+        
+        for cluster_id, volumes, error in openstack_service.map_clusters(fetch_cluster_volumes, list(clusters_by_id)):
+            cluster = clusters_by_id[cluster_id]
+            if error is not None:
+                logger.warning(f"Failed to get volumes from cluster {cluster.name}: {error}")
                 continue
+            
+            # 处理每个卷
+            for volume in volumes:
+                all_volumes.append((volume, cluster))
+            
+            cluster_names.append(cluster.name)
         
         # 转换为字典格式
         volumes_data = []
@@ -732,10 +729,8 @@ def batch_volume_action_cross_cluster():
 @api.route('/volumes/export', methods=['POST'])
 @login_required
 def export_volumes():
-    """导出卷数据到Excel"""
+    """导出卷数据到Excel，format为csv时以流式CSV返回"""
     try:
-        import pandas as pd
-        from io import BytesIO
         from datetime import datetime
         
         cluster_id = request.args.get('cluster_id', type=int)
@@ -796,30 +791,6 @@ def export_volumes():
                 '集群名称': cluster.name
             })
         
-        # 创建DataFrame
-        df = pd.DataFrame(excel_data)
-        
-        # 创建Excel文件
-        output = BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            df.to_excel(writer, sheet_name='卷列表', index=False)
-            
-            # 设置列宽
-            worksheet = writer.sheets['卷列表']
-            for column in worksheet.columns:
-                max_length = 0
-                column_letter = column[0].column_letter
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                adjusted_width = min(max_length + 2, 50)
-                worksheet.column_dimensions[column_letter].width = adjusted_width
-        
-        output.seek(0)
-        
         # 生成文件名
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         filename = f'volumes_{cluster.name}_{timestamp}.xlsx'
@@ -834,8 +805,15 @@ def export_volumes():
             details=f'导出卷数据: {len(excel_data)}个卷'
         )
         
+        if data.get('format') == 'csv':
+            # 边生成边发送，不在内存中拼接完整文件
+            return csv_response(excel_data, f'volumes_{cluster.name}_{timestamp}.csv')
+        
+        # 创建Excel文件
+        output = build_excel(excel_data, '卷列表')
+        
         return send_file(
-            BytesIO(output.getvalue()),
+            output,
             mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
             as_attachment=True,
             download_name=filename
@@ -849,10 +827,8 @@ def export_volumes():
 @api.route('/volumes/export-cross-cluster', methods=['POST'])
 @login_required
 def export_volumes_cross_cluster():
-    """跨集群导出卷数据到Excel"""
+    """跨集群导出卷数据到Excel，format为csv时以流式CSV返回"""
     try:
-        import pandas as pd
-        from io import BytesIO
         from datetime import datetime
         
         data = request.get_json()
@@ -869,23 +845,27 @@ def export_volumes_cross_cluster():
         all_volumes = []
         
         if export_all:
-            # 导出所有集群的卷
-            for cluster in clusters:
-                try:
-                    volumes = openstack_service.list_volumes(
-                        cluster.id,
-                        status=filters.get('status'),
-                        search=filters.get('search'),
-                        volume_type=filters.get('volume_type')
-                    )
-                    # 为每个卷添加集群信息
-                    for volume in volumes:
-                        volume['cluster_name'] = cluster.name
-                        volume['cluster_id'] = cluster.id
-                        all_volumes.append(volume)
-                except Exception as e:
-                    logger.warning(f"Failed to get volumes from cluster {cluster.name}: {str(e)}")
+            # 导出所有集群的卷（各集群并发请求）
+            clusters_by_id = {cluster.id: cluster for cluster in clusters}
+            
+            def fetch_cluster_volumes(cluster_id):
+                return openstack_service.list_volumes(
+                    cluster_id,
+                    status=filters.get('status'),
+                    search=filters.get('search'),
+                    volume_type=filters.get('volume_type')
+                )
+            
+            for cluster_id, volumes, error in openstack_service.map_clusters(fetch_cluster_volumes, list(clusters_by_id)):
+                cluster = clusters_by_id[cluster_id]
+                if error is not None:
+                    logger.warning(f"Failed to get volumes from cluster {cluster.name}: {str(error)}")
                     continue
+                # 为每个卷添加集群信息
+                for volume in volumes:
+                    volume['cluster_name'] = cluster.name
+                    volume['cluster_id'] = cluster.id
+                    all_volumes.append(volume)
         else:
             # 导出选中的卷
             for volume_id in volume_ids:
@@ -932,30 +912,6 @@ def export_volumes_cross_cluster():
                 '集群名称': volume.get('cluster_name', '')
             })
         
-        # 创建DataFrame
-        df = pd.DataFrame(excel_data)
-        
-        # 创建Excel文件
-        output = BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            df.to_excel(writer, sheet_name='卷列表', index=False)
-            
-            # 设置列宽
-            worksheet = writer.sheets['卷列表']
-            for column in worksheet.columns:
-                max_length = 0
-                column_letter = column[0].column_letter
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                adjusted_width = min(max_length + 2, 50)
-                worksheet.column_dimensions[column_letter].width = adjusted_width
-        
-        output.seek(0)
-        
         # 生成文件名
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         filename = f'volumes_all_clusters_{timestamp}.xlsx'
@@ -971,8 +927,14 @@ def export_volumes_cross_cluster():
                 details=f'跨集群导出卷数据: {len(excel_data)}个卷'
             )
         
+        if data.get('format') == 'csv':
+            return csv_response(excel_data, f'volumes_all_clusters_{timestamp}.csv')
+        
+        # 创建Excel文件
+        output = build_excel(excel_data, '卷列表')
+        
         return send_file(
-            BytesIO(output.getvalue()),
+            output,
             mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
             as_attachment=True,
             download_name=filename
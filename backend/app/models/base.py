@@ -1,11 +1,28 @@
 """
 基础模型类
 """
+import sqlite3
 from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 
 db = SQLAlchemy()
 
+@event.listens_for(Engine, 'connect')
+def _set_sqlite_pragma(dbapi_connection, connection_record):
+    """SQLite连接建立时开启WAL，读写互不阻塞，并减少每次提交的fsync"""
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.execute('PRAGMA busy_timeout=30000')
+    cursor.execute('PRAGMA temp_store=MEMORY')
+    cursor.execute('PRAGMA cache_size=-16000')  # 约16MB页缓存
+    cursor.execute('PRAGMA mmap_size=268435456')  # 256MB内存映射
+    cursor.close()
+
 class BaseModel(db.Model):
     """基础模型类"""
     __abstract__ = True
@@ -1,6 +1,7 @@
 """
 OpenStack集群模型
 """
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from datetime import datetime
 from .base import db
 from app.utils.config_manager import config_manager
@@ -51,9 +52,10 @@ class OpenstackCluster(db.Model):
             return {}
         return config_manager.decrypt_credentials(self.encrypted_credentials)
     
-    def get_auth_config(self):
+    def get_auth_config(self, credentials=None):
         """获取OpenStack认证配置"""
-        credentials = self.get_credentials()
+        if credentials is None:
+            credentials = self.get_credentials()
         
         auth_config = {
             'auth_url': self.auth_url,
@@ -70,7 +72,14 @@ class OpenstackCluster(db.Model):
         """测试连接状态"""
         try:
             from app.services.openstack_service import openstack_service
-            result = openstack_service.test_cluster_connection(self.id)
+            # 在线程池中测试，认证服务无响应时不会无限占用请求线程
+            timeout = openstack_service.connection_test_timeout
+            try:
+                result = openstack_service.call_with_timeout(
+                    openstack_service.test_cluster_connection, self.id, timeout
+                )
+            except FutureTimeoutError:
+                result = {'success': False, 'error': f'连接超时：集群在{timeout}秒内未响应'}
             
             self.last_connection_test = datetime.utcnow()
             self.connection_status = 'connected' if result['success'] else 'failed'
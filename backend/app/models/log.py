@@ -8,6 +8,12 @@ class OperationLog(db.Model):
     """操作日志模型"""
     
     __tablename__ = 'operation_logs'
+    # 日志查询均为按用户/集群/资源过滤后按时间倒序，组合索引可直接按序扫描
+    __table_args__ = (
+        db.Index('ix_operation_logs_user_created', 'user_id', 'created_at'),
+        db.Index('ix_operation_logs_cluster_created', 'cluster_id', 'created_at'),
+        db.Index('ix_operation_logs_resource_created', 'resource_type', 'resource_id', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     
@@ -2,13 +2,18 @@
 OpenStack服务层
 重构后的OpenStack管理服务，修复原有代码问题
 """
+import hashlib
 import logging
+import threading
+import time
 from datetime import datetime, timedelta
 import pytz
 import re
-import pandas as pd
-import io
-from typing import Dict, List, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, Callable, Tuple
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from keystoneauth1.identity import v3
 from keystoneauth1 import session
 from novaclient import client as nova_client
@@ -21,6 +26,23 @@ from app.models.cluster import OpenstackCluster
 
 logger = logging.getLogger(__name__)
 
+# 终端控制序列（ANSI转义码）
+_ANSI_RE = re.compile(r"\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])")
+
+# Nova电源状态码（OS-EXT-STS:power_state）到名称的映射，下标即状态码
+_POWER_STATES = ("NOSTATE", "RUNNING", "UNKNOWN", "PAUSED", "SHUTDOWN", "UNKNOWN", "CRASHED", "SUSPENDED")
+
+# 实例操作：action -> (操作名称, 执行函数)
+_INSTANCE_ACTIONS = {
+    "start": ("启动", lambda i: i.start()),
+    "stop": ("停止", lambda i: i.stop()),
+    "reboot": ("重启", lambda i: i.reboot(reboot_type="SOFT")),
+    "hard_reboot": ("强制重启", lambda i: i.reboot(reboot_type="HARD")),
+    "pause": ("暂停", lambda i: i.pause()),
+    "unpause": ("恢复", lambda i: i.unpause()),
+    "delete": ("删除", lambda i: i.delete()),
+}
+
 class CustomBytesIO:
     """
     修复后的CustomBytesIO类，移除重复的__init__方法
@@ -63,69 +85,81 @@ class OpenstackService:
     """
     
     def __init__(self):
-        self.sessions = {}
-        self.nova_clients = {}
-        self.cinder_clients = {}
-        self.neutron_clients = {}
-        self.glance_clients = {}
+        self.cluster_clients = {}  # cluster_id -> (配置指纹, 客户端字典)，整体替换保证读到的客户端一致
+        self._clients_lock = threading.Lock()
         self.instance_cache = {}
         self.volume_cache = {}
+        self.resource_cache = {}  # (cluster_id, 名称) -> (数据, 获取时间)，镜像、网络等创建表单数据
+        self.resource_cache_timeout = 60
         self.cache_timeout = timedelta(seconds=300)  # 默认5分钟
         self.last_cache_update = {}
+        self.connection_test_timeout = 15  # 秒，连接测试最长占用请求线程的时间
+        self.request_timeout = 30  # 秒，单个OpenStack HTTP请求的超时，服务无响应时释放线程
+        # 跨集群的OpenStack调用以网络IO为主，用常驻线程池并发执行
+        self.executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix='openstack')
+        # 连接测试使用独立线程池，测试无响应的集群不会占满共享线程池
+        self.test_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='openstack-test')
         
-    def initialize_config(self):
-        """在应用上下文中初始化配置"""
-        if current_app:
-            self.cache_timeout = timedelta(seconds=current_app.config.get('CACHE_TIMEOUT', 300))
+    def initialize_config(self, app=None):
+        """按应用配置初始化缓存设置"""
+        if app is None:
+            if not current_app:
+                return
+            app = current_app
+        self.cache_timeout = timedelta(seconds=app.config.get('CACHE_TIMEOUT', 300))
     
-    def get_cluster_clients(self, cluster_id: int):
-        """获取指定集群的客户端"""
-        cluster = OpenstackCluster.query.get(cluster_id)
+    def get_cluster_clients(self, cluster_id: int, cluster: Optional[OpenstackCluster] = None,
+                            auth_config: Optional[Dict] = None):
+        """获取指定集群的客户端，集群认证配置变更后自动重建（各worker各自检测）"""
+        if cluster is None:
+            cluster = OpenstackCluster.query.get(cluster_id)
         if not cluster or not cluster.is_active:
             raise ValueError(f"Cluster {cluster_id} not found or inactive")
         
-        cluster_key = f"cluster_{cluster_id}"
-        
-        # 如果客户端不存在，创建新的
-        if cluster_key not in self.sessions:
-            self._create_cluster_clients(cluster, cluster_key)
+        fingerprint = self._client_fingerprint(cluster)
+        entry = self.cluster_clients.get(cluster_id)
+        if entry is None or entry[0] != fingerprint:
+            with self._clients_lock:
+                # 等锁期间其他线程可能已完成创建，再检查一次
+                entry = self.cluster_clients.get(cluster_id)
+                if entry is None or entry[0] != fingerprint:
+                    entry = (fingerprint, self._create_cluster_clients(cluster, auth_config))
+                    self.cluster_clients[cluster_id] = entry
         
-        return {
-            'nova': self.nova_clients.get(cluster_key),
-            'cinder': self.cinder_clients.get(cluster_key),
-            'neutron': self.neutron_clients.get(cluster_key),
-            'glance': self.glance_clients.get(cluster_key),
-            'session': self.sessions.get(cluster_key)
-        }
+        return dict(entry[1])
+    
+    @staticmethod
+    def _client_fingerprint(cluster: OpenstackCluster) -> str:
+        """集群认证配置的指纹，认证地址、区域或凭据变化时随之变化"""
+        raw = '\n'.join([cluster.auth_url or '', cluster.region_name or '', cluster.encrypted_credentials or ''])
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
     
-    def _create_cluster_clients(self, cluster: OpenstackCluster, cluster_key: str):
+    def _create_cluster_clients(self, cluster: OpenstackCluster, auth_config: Optional[Dict] = None) -> Dict:
         """为指定集群创建OpenStack客户端"""
         try:
-            auth_config = cluster.get_auth_config()
+            if auth_config is None:
+                auth_config = cluster.get_auth_config()
             
-            # 调试：记录认证配置（隐藏密码）
-            debug_config = auth_config.copy()
-            if 'password' in debug_config:
-                debug_config['password'] = '*' * len(debug_config['password'])
-            logger.info(f"Creating auth for cluster {cluster.name} with config: {debug_config}")
+            # 只记录非敏感字段，密码（包括其长度）不写入日志
+            logger.info(f"Creating auth for cluster {cluster.name}: "
+                        f"user={auth_config.get('username')}, project={auth_config.get('project_name')}")
             
             auth = v3.Password(**auth_config)
             
-            self.sessions[cluster_key] = session.Session(auth=auth)
-            self.nova_clients[cluster_key] = nova_client.Client(
-                2, session=self.sessions[cluster_key], region_name=cluster.region_name
-            )
-            self.cinder_clients[cluster_key] = cinder_client.Client(
-                3, session=self.sessions[cluster_key], region_name=cluster.region_name
-            )
-            self.neutron_clients[cluster_key] = neutron_client.Client(
-                session=self.sessions[cluster_key], region_name=cluster.region_name
-            )
-            self.glance_clients[cluster_key] = glance_client(
-                2, session=self.sessions[cluster_key], region_name=cluster.region_name
+            ks_session = session.Session(
+                auth=auth, session=self._build_http_session(), timeout=self.request_timeout,
+                app_name='ops_sys', app_version='1.0'
             )
+            clients = {
+                'nova': nova_client.Client(2, session=ks_session, region_name=cluster.region_name),
+                'cinder': cinder_client.Client(3, session=ks_session, region_name=cluster.region_name),
+                'neutron': neutron_client.Client(session=ks_session, region_name=cluster.region_name),
+                'glance': glance_client(2, session=ks_session, region_name=cluster.region_name),
+                'session': ks_session
+            }
             
             logger.info(f"✓ Cluster {cluster.name} clients created successfully")
+            return clients
             
         except Exception as e:
             error_msg = f"✗ Failed to create clients for cluster {cluster.name}: {str(e)}"
@@ -134,15 +168,32 @@ class OpenstackService:
             logger.error(f"Auth URL: {cluster.auth_url}")
             raise Exception(f"Failed to connect to OpenStack cluster: {str(e)}")
     
-    def test_cluster_connection(self, cluster_id: int) -> Dict[str, Any]:
+    def release_cluster_clients(self, cluster_id: int):
+        """移除集群客户端，集群删除后调用；不主动关闭HTTP会话，正在进行的请求仍可使用"""
+        with self._clients_lock:
+            self.cluster_clients.pop(cluster_id, None)
+    
+    @staticmethod
+    def _build_http_session() -> requests.Session:
+        """创建带连接池的HTTP会话，集群下各客户端共用连接和Keystone令牌"""
+        http_session = requests.Session()
+        # 仅重试建立连接失败（请求未发出）；读超时和错误状态码不重试，避免重复提交非幂等操作
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32,
+                              max_retries=Retry(total=2, connect=2, read=0, status=0, backoff_factor=0.1))
+        http_session.mount('https://', adapter)
+        http_session.mount('http://', adapter)
+        return http_session
+    
+    def test_cluster_connection(self, cluster_id: int, cluster: Optional[OpenstackCluster] = None,
+                                auth_config: Optional[Dict] = None) -> Dict[str, Any]:
         """测试集群连接"""
         try:
             logger.info(f"Testing connection for cluster {cluster_id}")
             
-            # 清除缓存，强制重新创建客户端
+            # 清除缓存；认证配置变更时get_cluster_clients会重建客户端
             self.clear_cache(cluster_id)
             
-            clients = self.get_cluster_clients(cluster_id)
+            clients = self.get_cluster_clients(cluster_id, cluster, auth_config)
             nova_client = clients['nova']
             
             # 简单测试：获取服务列表
@@ -172,6 +223,59 @@ class OpenstackService:
                 'error_type': error_type
             }
     
+    def test_and_describe(self, cluster_id: int) -> Dict[str, Any]:
+        """测试集群连接并返回集群及凭据摘要，集群记录和凭据只读取、解密一次"""
+        cluster = OpenstackCluster.query.get(cluster_id)
+        if not cluster:
+            raise ValueError(f"Cluster {cluster_id} not found")
+        
+        credentials = cluster.get_credentials()
+        auth_config = cluster.get_auth_config(credentials)
+        
+        return {
+            'cluster': {
+                'id': cluster.id,
+                'name': cluster.name,
+                'auth_url': cluster.auth_url,
+                'region_name': cluster.region_name
+            },
+            'credentials_summary': {
+                'username': credentials.get('username'),
+                'project_name': credentials.get('project_name'),
+                'user_domain_name': credentials.get('user_domain_name'),
+                'project_domain_name': credentials.get('project_domain_name')
+            },
+            'result': self.test_cluster_connection(cluster_id, cluster, auth_config)
+        }
+    
+    @staticmethod
+    def _call_in_app_context(app, func: Callable, cluster_id: int):
+        """在工作线程中推入应用上下文后执行（数据库查询依赖应用上下文）"""
+        with app.app_context():
+            return func(cluster_id)
+    
+    def call_with_timeout(self, func: Callable[[int], Any], cluster_id: int, timeout: float) -> Any:
+        """在连接测试线程池中执行func(cluster_id)，超时抛出concurrent.futures.TimeoutError（后台任务继续执行至结束）"""
+        app = current_app._get_current_object()
+        future = self.test_executor.submit(self._call_in_app_context, app, func, cluster_id)
+        return future.result(timeout=timeout)
+    
+    def map_clusters(self, func: Callable[[int], Any], cluster_ids: List[int]) -> List[Tuple[int, Any, Optional[Exception]]]:
+        """在线程池中对多个集群并发执行func，按输入顺序返回(cluster_id, 结果, 异常)"""
+        app = current_app._get_current_object()
+        futures = [
+            (cluster_id, self.executor.submit(self._call_in_app_context, app, func, cluster_id))
+            for cluster_id in cluster_ids
+        ]
+        
+        results = []
+        for cluster_id, future in futures:
+            try:
+                results.append((cluster_id, future.result(), None))
+            except Exception as e:
+                results.append((cluster_id, None, e))
+        return results
+    
     def _get_friendly_error_message(self, exception) -> str:
         """将技术错误转换为用户友好的错误信息"""
         error_str = str(exception).lower()
@@ -248,6 +352,21 @@ class OpenstackService:
             "power_state": self._get_power_state(instance),
         }
     
+    def get_resource_cache(self, cluster_id: int, name: str) -> Optional[Any]:
+        """获取按resource_cache_timeout缓存的集群资源数据，未命中或过期返回None"""
+        cached = self.resource_cache.get((cluster_id, name))
+        if cached and time.monotonic() - cached[1] < self.resource_cache_timeout:
+            return cached[0]
+        return None
+    
+    def set_resource_cache(self, cluster_id: int, name: str, data: Any):
+        self.resource_cache[(cluster_id, name)] = (data, time.monotonic())
+    
+    def invalidate_resource_cache(self, cluster_id: int):
+        """集群资源变更（创建、删除网络或安全组等）后清除其资源缓存"""
+        for key in [k for k in list(self.resource_cache) if k[0] == cluster_id]:
+            self.resource_cache.pop(key, None)
+    
     def _get_flavor_info(self, instance, cluster_id: int) -> str:
         """获取实例规格信息"""
         try:
@@ -274,27 +393,24 @@ class OpenstackService:
     
     def _get_power_state(self, instance) -> str:
         """获取实例电源状态"""
-        power_states = {
-            0: "NOSTATE",
-            1: "RUNNING",
-            3: "PAUSED", 
-            4: "SHUTDOWN",
-            6: "CRASHED",
-            7: "SUSPENDED",
-        }
-        return power_states.get(
-            getattr(instance, "OS-EXT-STS:power_state", 0), "UNKNOWN"
-        )
+        code = getattr(instance, "OS-EXT-STS:power_state", 0)
+        if isinstance(code, int) and 0 <= code < len(_POWER_STATES):
+            return _POWER_STATES[code]
+        return "UNKNOWN"
     
     def clean_string(self, value) -> str:
         """清理字符串，确保中文字符正确显示"""
-        if isinstance(value, str):
-            ansi_escape = re.compile(r"\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])")
-            value = ansi_escape.sub("", value)
-            try:
-                value = value.encode("latin1").decode("utf-8")
-            except (UnicodeEncodeError, UnicodeDecodeError):
-                pass
+        if not isinstance(value, str):
+            return value
+        if "\x1b" in value:
+            value = _ANSI_RE.sub("", value)
+        # 纯ASCII字符串经latin1/utf-8转换后不变，无需处理
+        if value.isascii():
+            return value
+        try:
+            value = value.encode("latin1").decode("utf-8")
+        except (UnicodeEncodeError, UnicodeDecodeError):
+            pass
         return value
     
     def search_instances(self, cluster_id: int, filters: Optional[Dict] = None) -> Dict:
@@ -302,32 +418,36 @@ class OpenstackService:
         try:
             instances = self._get_cached_instances(cluster_id)
             filtered_instances = self._apply_filters(instances, filters)
-            
-            # 排序
-            if filters and "sort_by" in filters:
-                reverse = filters.get("sort_order", "desc").lower() == "desc"
-                filtered_instances.sort(
-                    key=lambda x: str(x.get(filters["sort_by"], "")), reverse=reverse
-                )
-            
-            # 分页
-            page = int(filters.get("page", 1)) if filters else 1
-            per_page = int(filters.get("per_page", 10)) if filters else 10
-            start_idx = (page - 1) * per_page
-            end_idx = start_idx + per_page
-            
-            return {
-                "total": len(filtered_instances),
-                "page": page,
-                "per_page": per_page,
-                "total_pages": (len(filtered_instances) + per_page - 1) // per_page,
-                "data": filtered_instances[start_idx:end_idx],
-            }
+            return self._paginate_instances(filtered_instances, filters)
             
         except Exception as e:
             logger.error(f"Failed to search instances: {str(e)}")
             raise
     
+    def _paginate_instances(self, filtered_instances: List[Dict], filters: Optional[Dict]) -> Dict:
+        """排序并分页"""
+        # 排序
+        if filters and "sort_by" in filters:
+            reverse = filters.get("sort_order", "desc").lower() == "desc"
+            # 未过滤时filtered_instances就是缓存列表本身，不能原地排序
+            filtered_instances = sorted(
+                filtered_instances, key=lambda x: str(x.get(filters["sort_by"], "")), reverse=reverse
+            )
+        
+        # 分页
+        page = int(filters.get("page", 1)) if filters else 1
+        per_page = int(filters.get("per_page", 10)) if filters else 10
+        start_idx = (page - 1) * per_page
+        end_idx = start_idx + per_page
+        
+        return {
+            "total": len(filtered_instances),
+            "page": page,
+            "per_page": per_page,
+            "total_pages": (len(filtered_instances) + per_page - 1) // per_page,
+            "data": filtered_instances[start_idx:end_idx],
+        }
+    
     def _apply_filters(self, instances: List[Dict], filters: Optional[Dict]) -> List[Dict]:
         """应用过滤条件"""
         if not filters:
@@ -359,17 +479,7 @@ class OpenstackService:
     
     def perform_instance_action(self, cluster_id: int, instance_id: str, action: str) -> str:
         """执行实例操作"""
-        actions = {
-            "start": ("启动", lambda i: i.start()),
-            "stop": ("停止", lambda i: i.stop()),
-            "reboot": ("重启", lambda i: i.reboot(reboot_type="SOFT")),
-            "hard_reboot": ("强制重启", lambda i: i.reboot(reboot_type="HARD")),
-            "pause": ("暂停", lambda i: i.pause()),
-            "unpause": ("恢复", lambda i: i.unpause()),
-            "delete": ("删除", lambda i: i.delete()),
-        }
-        
-        if action not in actions:
+        if action not in _INSTANCE_ACTIONS:
             raise ValueError(f"Unsupported action: {action}")
         
         try:
@@ -377,7 +487,7 @@ class OpenstackService:
             nova_client = clients['nova']
             
             instance = nova_client.servers.get(instance_id)
-            action_name, action_func = actions[action]
+            action_name, action_func = _INSTANCE_ACTIONS[action]
             
             logger.info(f"Performing {action_name} on instance {instance.name}")
             action_func(instance)
@@ -402,9 +512,11 @@ class OpenstackService:
                     del self.instance_cache[key]
                 if key in self.last_cache_update:
                     del self.last_cache_update[key]
+            self.invalidate_resource_cache(cluster_id)
         else:
             self.instance_cache.clear()
             self.volume_cache.clear()
+            self.resource_cache.clear()
             self.last_cache_update.clear()
     
     def list_volumes(self, cluster_id: int, status: str = None, search: str = None, volume_type: str = None) -> List[Dict]:
@@ -684,6 +796,7 @@ class OpenstackService:
             neutron_client = clients['neutron']
             
             neutron_client.delete_network(network_id)
+            self.invalidate_resource_cache(cluster_id)
             logger.info(f"Successfully initiated delete for network {network_id} in cluster {cluster_id}")
             return True
             
@@ -698,6 +811,7 @@ class OpenstackService:
             neutron_client = clients['neutron']
             
             neutron_client.update_network(network_id, {'network': {'admin_state_up': admin_state_up}})
+            self.invalidate_resource_cache(cluster_id)
             logger.info(f"Successfully updated admin state for network {network_id} in cluster {cluster_id} to {admin_state_up}")
             return True
             
@@ -2,5 +2,7 @@
 工具模块
 """
 from .config_manager import config_manager
+from .excel_export import build_excel, iter_csv, csv_response
+from .pagination import get_page_args
 
-__all__ = ['config_manager']
\ No newline at end of file
+__all__ = ['config_manager', 'build_excel', 'iter_csv', 'csv_response', 'get_page_args']
\ No newline at end of file
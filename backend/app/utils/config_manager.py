@@ -15,17 +15,21 @@ class ConfigManager:
     def __init__(self):
         self._fernet = None
     
+    def init_app(self, app):
+        """应用启动时读取密钥并创建加密器，之后加解密不再访问密钥文件"""
+        self._fernet = Fernet(self._get_or_create_key(app.instance_path))
+    
     @property
     def fernet(self):
         """获取加密器实例"""
         if self._fernet is None:
-            key = self._get_or_create_key()
+            key = self._get_or_create_key(current_app.instance_path)
             self._fernet = Fernet(key)
         return self._fernet
     
-    def _get_or_create_key(self) -> bytes:
+    def _get_or_create_key(self, instance_path: str) -> bytes:
         """获取或创建加密密钥"""
-        key_file = os.path.join(current_app.instance_path, 'secret.key')
+        key_file = os.path.join(instance_path, 'secret.key')
         
         # 确保目录存在
         os.makedirs(os.path.dirname(key_file), exist_ok=True)
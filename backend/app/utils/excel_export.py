@@ -0,0 +1,60 @@
+"""
+Excel导出工具
+直接逐行写出工作簿，不经过pandas DataFrame
+"""
+import csv
+from io import BytesIO, StringIO
+from typing import Any, Dict, Iterator, List
+from urllib.parse import quote
+from flask import Response
+
+def _cell_text(value: Any) -> str:
+    return '' if value is None else str(value)
+
+def build_excel(rows: List[Dict[str, Any]], sheet_name: str, max_width: int = 50) -> BytesIO:
+    """将字典列表导出为Excel，列顺序取第一行的键顺序"""
+    # openpyxl仅在导出xlsx时加载，减少worker启动时间和内存
+    from openpyxl import Workbook
+    from openpyxl.utils import get_column_letter
+    
+    headers = list(rows[0].keys()) if rows else []
+    
+    # write_only模式逐行序列化，不在内存中保留完整的单元格对象
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet(sheet_name)
+    
+    # write_only模式下列宽必须在写入任何行之前设置
+    for index, header in enumerate(headers, 1):
+        width = max([len(header)] + [len(_cell_text(row.get(header))) for row in rows])
+        worksheet.column_dimensions[get_column_letter(index)].width = min(width + 2, max_width)
+    
+    worksheet.append(headers)
+    for row in rows:
+        worksheet.append([row.get(header) for header in headers])
+    
+    output = BytesIO()
+    workbook.save(output)
+    output.seek(0)
+    return output
+
+def iter_csv(rows: List[Dict[str, Any]]) -> Iterator[str]:
+    """逐行生成CSV内容，用于流式响应，列顺序取第一行的键顺序"""
+    headers = list(rows[0].keys()) if rows else []
+    buffer = StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=headers, extrasaction='ignore')
+    
+    # 带BOM，Excel打开时才能正确识别中文
+    writer.writeheader()
+    yield '\ufeff' + buffer.getvalue()
+    
+    for row in rows:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerow(row)
+        yield buffer.getvalue()
+
+def csv_response(rows: List[Dict[str, Any]], filename: str) -> Response:
+    """以流式CSV响应返回，文件名按RFC 5987编码以支持中文"""
+    ascii_name = filename.encode('ascii', 'ignore').decode() or 'export.csv'
+    disposition = f"attachment; filename=\"{ascii_name}\"; filename*=UTF-8''{quote(filename)}"
+    return Response(iter_csv(rows), mimetype='text/csv', headers={'Content-Disposition': disposition})
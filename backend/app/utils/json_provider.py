@@ -0,0 +1,38 @@
+"""
+基于orjson的Flask JSON序列化
+未安装orjson时保持Flask默认实现
+"""
+from typing import Any, Union
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson为可选依赖
+    orjson = None
+
+class OrjsonProvider(DefaultJSONProvider):
+    """使用orjson序列化的JSON Provider，输出与默认实现保持兼容"""
+    
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        # datetime交给Flask默认的default处理，保持HTTP日期格式不变
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        
+        try:
+            return orjson.dumps(obj, default=kwargs.get('default', self.default), option=option).decode()
+        except TypeError:
+            # orjson不支持的情况（如超过64位的整数）回退到标准库
+            return super().dumps(obj, **kwargs)
+    
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+def init_json_provider(app):
+    """安装了orjson时替换应用的JSON Provider"""
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
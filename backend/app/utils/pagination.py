@@ -0,0 +1,13 @@
+"""
+分页参数解析
+"""
+from typing import Tuple
+from flask import request
+
+MAX_PER_PAGE = 200
+
+def get_page_args(default_per_page: int = 20) -> Tuple[int, int]:
+    """读取查询参数中的page和per_page，非法值取默认值，per_page不超过MAX_PER_PAGE"""
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('per_page', default_per_page, type=int)
+    return max(page, 1), min(max(per_page, 1), MAX_PER_PAGE)
@@ -28,6 +28,7 @@ class Config:
     
     # 文件上传配置
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB
+    MAX_JSON_BODY_LENGTH = 1024 * 1024  # API的JSON请求体上限1MB
     UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads')
     
     # 日志配置
@@ -53,6 +54,11 @@ class DevelopmentConfig(Config):
     # 开发环境优先使用环境变量中的DATABASE_URL，默认使用SQLite
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or \
         os.environ.get('DEV_DATABASE_URL') or 'sqlite:///ops_sys_dev.db'
+    # 开发环境无需每次借出连接都ping一次
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_pre_ping': False,
+        'pool_recycle': 3600,
+    }
 
 class TestingConfig(Config):
     """测试环境配置"""
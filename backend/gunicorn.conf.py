@@ -0,0 +1,30 @@
+"""
+gunicorn配置
+接口耗时主要在OpenStack API调用上，属于I/O密集型，优先使用gevent协程worker
+"""
+import multiprocessing
+import os
+
+try:
+    import gevent  # noqa: F401
+    _default_worker_class = 'gevent'
+except ImportError:  # gevent为可选依赖，未安装时退回线程worker
+    _default_worker_class = 'gthread'
+
+bind = os.getenv('GUNICORN_BIND') or f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', 5001)}"
+workers = int(os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', _default_worker_class)
+
+# gevent worker: 每个进程的最大并发连接数
+worker_connections = 1000
+# gthread worker: 每个进程的线程数
+threads = int(os.getenv('GUNICORN_THREADS', 8))
+
+# OpenStack接口响应较慢，放宽超时
+timeout = 120
+graceful_timeout = 30
+keepalive = 5
+
+accesslog = '-'
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
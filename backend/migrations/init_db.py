@@ -6,6 +6,7 @@ import os
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from sqlalchemy import inspect
 from app import create_app, db
 from app.models import User, OpenstackCluster, OperationLog
 from app.utils.config_manager import config_manager
@@ -20,6 +21,9 @@ def init_database():
         db.create_all()
         print("✓ Database tables created")
         
+        # create_all不会修改已存在的表，为旧库补建索引
+        create_missing_indexes()
+        
         # 创建默认用户
         create_default_users()
         
@@ -28,6 +32,16 @@ def init_database():
         
         print("✓ Database initialization completed")
 
+def create_missing_indexes():
+    """为已存在的表补建模型中新增的索引"""
+    inspector = inspect(db.engine)
+    for table in (OperationLog.__table__,):
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(bind=db.engine)
+                print(f"✓ Index {index.name} created")
+
 def create_default_users():
     """创建默认用户"""
     # 创建超级管理员
@@ -11,6 +11,7 @@ load_dotenv()
 os.environ['FLASK_ENV'] = 'development'
 os.environ['FLASK_DEBUG'] = '1'
 
+from sqlalchemy import text
 from app import create_app, db
 from app.models import User, OpenstackCluster, OperationLog
 
@@ -44,6 +45,17 @@ def create_dev_data():
     print("  - admin/admin (super_admin)")
     print("  - test/test (operator)")
 
+def warm_db_pool():
+    """预热数据库连接池，避免首个请求承担引擎初始化开销"""
+    with db.engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    
+    # 同时占用再归还，才能让连接池真正建立多个连接
+    pool_size = db.engine.pool.size() if hasattr(db.engine.pool, 'size') else 1
+    connections = [db.engine.connect() for _ in range(pool_size)]
+    for conn in connections:
+        conn.close()
+
 if __name__ == '__main__':
     app = create_app('development')
     
@@ -54,6 +66,9 @@ if __name__ == '__main__':
         # 创建开发数据
         create_dev_data()
         
+        # 预热连接池
+        warm_db_pool()
+        
         print(" Starting development server...")
         print("URL: http://localhost:5001")
         print("Debug mode: ON")
@@ -14,7 +14,6 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, current_dir)
 
 from app import create_app
-from app.models.cluster import OpenstackCluster
 from app.services.openstack_service import openstack_service
 
 def test_cluster_connection():
@@ -25,27 +24,28 @@ def test_cluster_connection():
     app = create_app()
     
     with app.app_context():
-        # 获取集群2
-        cluster = OpenstackCluster.query.get(2)
-        if not cluster:
+        # 获取集群2：集群记录和凭据只读取一次，并复用于连接测试
+        try:
+            described = openstack_service.test_and_describe(2)
+        except ValueError:
             print("X 集群2不存在")
             return
         
-        print(f"测试集群: {cluster.name}")
-        print(f"认证URL: {cluster.auth_url}")
-        print(f"区域: {cluster.region_name}")
+        cluster = described['cluster']
+        print(f"测试集群: {cluster['name']}")
+        print(f"认证URL: {cluster['auth_url']}")
+        print(f"区域: {cluster['region_name']}")
         
-        # 获取凭据（调试）
-        credentials = cluster.get_credentials()
+        # 凭据摘要（调试）
+        credentials = described['credentials_summary']
         print(f"用户名: {credentials.get('username')}")
         print(f"项目名: {credentials.get('project_name')}")
         print(f"用户域: {credentials.get('user_domain_name')}")
         print(f"项目域: {credentials.get('project_domain_name')}")
         print()
         
-        # 测试连接
-        print("开始连接测试...")
-        result = openstack_service.test_cluster_connection(2)
+        # 连接测试结果
+        result = described['result']
         
         if result['success']:
             print(f"+ 连接成功: {result['message']}")
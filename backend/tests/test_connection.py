@@ -121,6 +121,32 @@ def test_service_endpoints(sess):
         print(f"错误类型: {type(e).__name__}")
         return None
 
+def run_diagnostics(config):
+    """认证失败后逐项诊断，定位失败原因"""
+    print("\n🔍 认证失败，开始逐项诊断...")
+    
+    # 步骤1：测试网络连通性
+    if not test_network_connectivity(config['auth_url']):
+        print("\n❌ 网络连通性测试失败，请检查:")
+        print("1. URL是否正确")
+        print("2. 服务器是否运行")
+        print("3. 防火墙设置")
+        return False
+    
+    # 步骤2：测试Keystone端点
+    if not test_keystone_endpoint(config['auth_url']):
+        print("\n❌ Keystone端点测试失败，请检查:")
+        print("1. URL路径是否正确 (应该以/v3结尾)")
+        print("2. Keystone服务是否正常运行")
+        return False
+    
+    # 步骤3：网络和端点正常，问题出在认证
+    print("\n❌ 认证测试失败，请检查:")
+    print("1. 用户名和密码是否正确")
+    print("2. 项目名是否存在且用户有权限")
+    print("3. 用户域和项目域设置")
+    return False
+
 def main():
     """主测试函数"""
     print("🧪 OpenStack详细连接诊断")
@@ -144,31 +170,12 @@ def main():
     print(f"项目域: {config['project_domain_name']}")
     print("-" * 50)
     
-    # 步骤1：测试网络连通性
-    if not test_network_connectivity(config['auth_url']):
-        print("\n❌ 网络连通性测试失败，请检查:")
-        print("1. URL是否正确")
-        print("2. 服务器是否运行")
-        print("3. 防火墙设置")
-        return False
-    
-    # 步骤2：测试Keystone端点
-    if not test_keystone_endpoint(config['auth_url']):
-        print("\n❌ Keystone端点测试失败，请检查:")
-        print("1. URL路径是否正确 (应该以/v3结尾)")
-        print("2. Keystone服务是否正常运行")
-        return False
-    
-    # 步骤3：测试认证
+    # 快速路径：直接认证，token获取成功即说明网络和Keystone端点均正常
     sess = test_authentication(**config)
     if not sess:
-        print("\n❌ 认证测试失败，请检查:")
-        print("1. 用户名和密码是否正确")
-        print("2. 项目名是否存在且用户有权限")
-        print("3. 用户域和项目域设置")
-        return False
+        return run_diagnostics(config)
     
-    # 步骤4：测试服务端点
+    # 测试服务端点
     clients = test_service_endpoints(sess)
     if not clients:
         print("\n❌ 服务端点测试失败，请检查:")
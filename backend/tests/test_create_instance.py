@@ -4,6 +4,8 @@
 """
 import os
 import sys
+import json
+import time
 from dotenv import load_dotenv
 
 # 加载环境变量
@@ -16,6 +18,61 @@ sys.path.insert(0, current_dir)
 from app import create_app
 from app.models.cluster import OpenstackCluster
 from app.services.openstack_service import openstack_service
+from novaclient import client as nova_client_lib
+from neutronclient.v2_0 import client as neutron_client_lib
+from glanceclient import Client as glance_client_lib
+
+ENDPOINT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'ops_sys')
+# 端点缓存有效期（秒），过期后重新通过服务目录发现，避免端点迁移后一直使用旧地址
+ENDPOINT_CACHE_TTL = 24 * 3600
+
+# 客户端名称 -> 服务目录中的service_type
+ENDPOINT_SERVICE_TYPES = {
+    'nova': 'compute',
+    'neutron': 'network',
+    'glance': 'image',
+}
+
+def get_clients_with_cached_endpoints(cluster):
+    """获取客户端，命中未过期的本地端点缓存时跳过服务目录发现"""
+    cache_file = os.path.join(ENDPOINT_CACHE_DIR, f'endpoints_{cluster.id}.json')
+    clients = openstack_service.get_cluster_clients(cluster.id)
+    sess = clients['session']
+    
+    if os.path.exists(cache_file) and time.time() - os.path.getmtime(cache_file) < ENDPOINT_CACHE_TTL:
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            return {
+                'nova': nova_client_lib.Client(
+                    2, session=sess, region_name=cluster.region_name,
+                    endpoint_override=cached['nova']
+                ),
+                'neutron': neutron_client_lib.Client(
+                    session=sess, region_name=cluster.region_name,
+                    endpoint_override=cached['neutron']
+                ),
+                'glance': glance_client_lib(
+                    2, session=sess, region_name=cluster.region_name,
+                    endpoint=cached['glance']
+                ),
+            }
+        except Exception as e:
+            print(f"- 端点缓存不可用，回退到服务发现: {e}")
+    
+    # 首次运行或缓存过期：通过服务目录解析端点并写入缓存
+    try:
+        endpoints = {
+            name: sess.get_endpoint(service_type=service_type, region_name=cluster.region_name)
+            for name, service_type in ENDPOINT_SERVICE_TYPES.items()
+        }
+        os.makedirs(ENDPOINT_CACHE_DIR, exist_ok=True)
+        with open(cache_file, 'w', encoding='utf-8') as f:
+            json.dump(endpoints, f, indent=2)
+    except Exception as e:
+        print(f"- 端点缓存写入失败: {e}")
+    
+    return clients
 
 def test_create_instance_data():
     """测试创建实例所需数据API"""
@@ -38,7 +95,7 @@ def test_create_instance_data():
         
         try:
             # 获取OpenStack客户端
-            clients = openstack_service.get_cluster_clients(cluster.id)
+            clients = get_clients_with_cached_endpoints(cluster)
             nova_client = clients['nova']
             neutron_client = clients['neutron']
             glance_client = clients['glance']
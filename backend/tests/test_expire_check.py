@@ -4,6 +4,7 @@
 """
 import os
 import sys
+from itertools import chain
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 
@@ -18,6 +19,34 @@ from app import create_app
 from app.models.cluster import OpenstackCluster
 from app.services.openstack_service import openstack_service
 
+try:
+    # C扩展解析ISO-8601，原生支持Z后缀
+    from ciso8601 import parse_datetime as _parse_iso8601
+except ImportError:
+    _parse_iso8601 = None
+
+def parse_destroy_at(value):
+    """解析destroy_at元数据为naive UTC时间"""
+    if _parse_iso8601 is not None:
+        destroy_time = _parse_iso8601(value)
+    else:
+        destroy_time = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if destroy_time.tzinfo:
+        destroy_time = destroy_time.replace(tzinfo=None)
+    return destroy_time
+
+def iter_servers(nova_client, batch_size=1000):
+    """按marker分页遍历实例，每次只保留一批数据在内存中"""
+    marker = None
+    while True:
+        batch = nova_client.servers.list(detailed=True, marker=marker, limit=batch_size)
+        if not batch:
+            return
+        yield batch
+        if len(batch) < batch_size:
+            return
+        marker = batch[-1].id
+
 def test_expire_check():
     """测试到期检查API"""
     print("测试到期检查功能")
@@ -46,22 +75,21 @@ def test_expire_check():
             
             # 获取实例列表
             print("\n>> 检查实例销毁时间设置...")
-            servers = nova_client.servers.list(detailed=True)
-            
-            print(f"+ 找到 {len(servers)} 个实例")
-            
             current_time = datetime.utcnow()
             expired_count = 0
             warning_count = 0
             normal_count = 0
+            server_count = 0
+            first_server = None
             
-            for server in servers:
+            for server in chain.from_iterable(iter_servers(nova_client)):
+                server_count += 1
+                if first_server is None:
+                    first_server = server
                 metadata = getattr(server, 'metadata', {})
                 if 'destroy_at' in metadata:
                     try:
-                        destroy_time = datetime.fromisoformat(metadata['destroy_at'].replace('Z', '+00:00'))
-                        if destroy_time.tzinfo:
-                            destroy_time = destroy_time.replace(tzinfo=None)
+                        destroy_time = parse_destroy_at(metadata['destroy_at'])
                         
                         time_diff = destroy_time - current_time
                         
@@ -82,14 +110,15 @@ def test_expire_check():
                     normal_count += 1
                     print(f"[NONE] 未设置: {server.name} - 无销毁时间")
             
+            print(f"\n+ 找到 {server_count} 个实例")
             print(f"\n>> 统计结果:")
             print(f"   [EXPIRED] 已到期: {expired_count}")
             print(f"   [WARNING] 即将到期 (24h内): {warning_count}")
             print(f"   [NORMAL] 正常/未设置: {normal_count}")
             
             # 测试一个实例设置近期到期时间
-            if servers:
-                test_server = servers[0]
+            if first_server:
+                test_server = first_server
                 print(f"\n>> 测试设置实例到期时间...")
                 print(f"   实例: {test_server.name}")
                 
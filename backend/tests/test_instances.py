@@ -42,13 +42,13 @@ def test_instances_api():
             
             print(f"+ 成功获取Nova客户端")
             
-            # 获取实例列表
+            # 获取实例列表（只取前5个，避免拉取整个租户的详细数据）
             print("获取实例列表...")
-            servers = nova_client.servers.list(detailed=True)
-            print(f"+ 找到 {len(servers)} 个实例")
+            servers = nova_client.servers.list(detailed=True, limit=5)
+            print(f"+ 获取到 {len(servers)} 个实例 (最多5个)")
             
             # 显示前5个实例
-            for i, server in enumerate(servers[:5]):
+            for i, server in enumerate(servers):
                 print(f"  {i+1}. {server.name} - {server.status} ({server.id})")
             
             if servers:
@@ -67,7 +67,9 @@ def test_instances_api():
                 # 测试获取控制台日志
                 try:
                     console_log = nova_client.servers.get_console_output(first_server.id, length=5)
-                    print(f"+ 控制台日志获取成功 ({len(console_log.split(chr(10)))} 行)")
+                    # 只需要行数，直接计数换行符，不构建行列表
+                    line_count = console_log.count('\n') + (0 if console_log.endswith('\n') else 1)
+                    print(f"+ 控制台日志获取成功 ({line_count} 行)")
                 except Exception as e:
                     print(f"- 控制台日志获取失败: {e}")
             
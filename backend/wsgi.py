@@ -0,0 +1,12 @@
+"""
+WSGI入口
+生产环境通过gunicorn加载: gunicorn -c gunicorn.conf.py wsgi:app
+"""
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app import create_app
+
+app = create_app(os.getenv('FLASK_ENV') or 'production')